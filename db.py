@@ -0,0 +1,37 @@
+"""Shared Firestore client factory.
+
+All modules should obtain the client through get_db() so the process holds
+a single AsyncClient — and therefore a single set of gRPC channels and
+cached credentials — no matter how many import paths load it.
+"""
+from functools import lru_cache
+import logging
+import os
+
+from google.cloud import firestore
+
+logger = logging.getLogger("todo.db")
+
+
+@lru_cache(maxsize=1)
+def get_db():
+    """Return the process-wide Firestore client, creating it on first use.
+
+    Returns None when initialization fails (e.g. missing credentials) so
+    callers can degrade to 503 responses instead of failing at import.
+    """
+    # Prefer explicit project env var if provided
+    project = os.environ.get("FIRESTORE_PROJECT") or os.environ.get("GOOGLE_CLOUD_PROJECT")
+    # Detect emulator usage
+    emulator = os.environ.get("FIRESTORE_EMULATOR_HOST")
+    if emulator:
+        logger.info("Detected Firestore emulator via FIRESTORE_EMULATOR_HOST=%s", emulator)
+    try:
+        if project:
+            logger.info("Initializing Firestore client with project=%s", project)
+            return firestore.AsyncClient(project=project)
+        logger.info("Initializing Firestore client with default credentials")
+        return firestore.AsyncClient()
+    except Exception as exc:
+        logger.exception("Failed to initialize Firestore client: %s", exc)
+        return None
@@ -1,15 +1,21 @@
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ConfigDict, field_validator
 from typing import List, Optional
 from datetime import datetime, timezone
-import os
 import logging
+import re
+import sys
+import time
 
-from google.cloud import firestore
+from google.api_core.exceptions import NotFound
 
-app = FastAPI(title="Todo API")
+from db import get_db
+
+# orjson serializes responses several times faster than the stdlib json
+# encoder, which matters most on the list endpoint.
+app = FastAPI(title="Todo API", default_response_class=ORJSONResponse)
 
 # Basic structured logging
 logging.basicConfig(
@@ -21,40 +27,52 @@ logger = logging.getLogger("todo")
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+# index.html is static for the lifetime of the process; read it once at
+# import instead of opening the file on every homepage request.
+with open("static/index.html", "r", encoding="utf-8") as f:
+    _INDEX_HTML = f.read()
+
+
 # Serve index.html at the root
 @app.get("/", response_class=HTMLResponse)
 async def read_root():
-    with open("static/index.html", "r", encoding="utf-8") as f:
-        return f.read()
-
-# Initialize Firestore DB (safe, env-aware)
-def _init_firestore_client():
-    # Prefer explicit project env var if provided
-    project = os.environ.get("FIRESTORE_PROJECT") or os.environ.get("GOOGLE_CLOUD_PROJECT")
-    # Detect emulator usage
-    emulator = os.environ.get("FIRESTORE_EMULATOR_HOST")
-    if emulator:
-        logger.info("Detected Firestore emulator via FIRESTORE_EMULATOR_HOST=%s", emulator)
-    try:
-        if project:
-            logger.info("Initializing Firestore client with project=%s", project)
-            return firestore.Client(project=project)
-        logger.info("Initializing Firestore client with default credentials")
-        return firestore.Client()
-    except Exception as exc:
-        logger.exception("Failed to initialize Firestore client: %s", exc)
-        return None
+    return _INDEX_HTML
+
+# Process-wide Firestore client (see db.get_db for the lazy singleton)
+db = get_db()
+
+# Cached collection reference shared by all handlers; avoids rebuilding a
+# CollectionReference on every request.
+TODOS = db.collection("todos") if db is not None else None
+
+# Validator lookup tables, built once at import for the per-write hot path.
+_RECUR_TYPES = frozenset({None, 'none', 'daily', 'weekly', 'weekdays', 'weekends', 'custom'})
+_WEEKDAYS = frozenset(range(7))
+
+# Canonical UTC timestamps ('Z'-terminated, no microseconds) can skip the
+# datetime parse/normalize round trip entirely.
+_ISO_Z_RE = re.compile(r'^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2})(:\d{2})?Z$')
 
+# datetime.fromisoformat accepts a trailing 'Z' natively from Python 3.11;
+# pick the parser once at import instead of branching on every call.
+if sys.version_info >= (3, 11):
+    _parse_iso = datetime.fromisoformat
+else:
+    def _parse_iso(v):
+        return datetime.fromisoformat(v[:-1] + '+00:00' if v.endswith('Z') else v)
 
-db = _init_firestore_client()
 
 class Task(BaseModel):
+    # Frozen instances are hashable and cannot drift after validation;
+    # unknown body keys are rejected at parse time instead of being
+    # stripped by hand later.
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     id: Optional[str] = None
-    title: str
+    title: str = "Untitled"
     duration: int = 60
     scheduledStart: Optional[str] = None
     recurrence: Optional[dict] = None
-    
 
     @field_validator('title')
     def title_must_not_be_empty(cls, v):
@@ -79,16 +97,22 @@ class Task(BaseModel):
             raise ValueError('scheduledStart must be an ISO datetime string')
         try:
             # parse ISO datetime; accept with or without timezone
-            dt = datetime.fromisoformat(v)
-            # If naive, assume UTC to avoid ambiguous storage. Clients should
-            # prefer sending timezone-aware timestamps (with 'Z' or an offset).
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            # Normalize to UTC and return canonical ISO with 'Z' (no microseconds)
-            dt_utc = dt.astimezone(timezone.utc).replace(microsecond=0)
-            return dt_utc.isoformat().replace('+00:00', 'Z')
+            dt = _parse_iso(v)
         except Exception:
             raise ValueError('scheduledStart must be a valid ISO datetime string')
+        # Fast path: already in the canonical form we would emit anyway, so
+        # skip the normalize/re-format step. The parse above still guards
+        # calendar validity — the regex only checks shape.
+        m = _ISO_Z_RE.match(v)
+        if m:
+            return v if m.group(2) else f"{m.group(1)}:00Z"
+        # If naive, assume UTC to avoid ambiguous storage. Clients should
+        # prefer sending timezone-aware timestamps (with 'Z' or an offset).
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        # Normalize to UTC and return canonical ISO with 'Z' (no microseconds)
+        dt_utc = dt.astimezone(timezone.utc).replace(microsecond=0)
+        return dt_utc.isoformat().replace('+00:00', 'Z')
 
     @field_validator('recurrence')
     def recurrence_must_be_well_formed(cls, v):
@@ -97,113 +121,156 @@ class Task(BaseModel):
         if not isinstance(v, dict):
             raise ValueError('recurrence must be an object')
         t = v.get('type')
-        if t not in (None, 'none', 'daily', 'weekly', 'weekdays', 'weekends', 'custom'):
+        if t not in _RECUR_TYPES:
             raise ValueError("recurrence.type must be one of 'none','daily','weekly','weekdays','weekends','custom'")
         if t == 'custom':
             days = v.get('days')
-            if not isinstance(days, list) or not all(isinstance(x, int) and 0 <= x <= 6 for x in days):
+            if (not isinstance(days, list)
+                    or not all(isinstance(x, int) for x in days)
+                    or not set(days).issubset(_WEEKDAYS)):
                 raise ValueError('recurrence.days must be a list of weekday numbers 0-6')
         return v
 
 
-class TaskCreate(BaseModel):
-    title: Optional[str] = None
-    duration: Optional[int] = None
-    scheduledStart: Optional[str] = None
-    recurrence: Optional[dict] = None
+# --- Task API (primary and only public API) ---
 
 
-# --- Task API (primary and only public API) ---
+# Defaults merged under each stored doc when listing; one dict splat per
+# row instead of a field-by-field lookup-with-default.
+_TASK_DEFAULTS = {"title": "", "duration": 60, "scheduledStart": None, "recurrence": None}
+
+# Short-lived cache of the full task list. Firestore reads dominate cost on
+# this read-heavy endpoint; every write path invalidates, so staleness is
+# bounded by the TTL even if a write comes from another process.
+_LIST_CACHE_TTL = 5.0
+_list_cache = None  # (monotonic timestamp, rows) or None
+
 
+def _invalidate_list_cache():
+    global _list_cache
+    _list_cache = None
 
-@app.get("/tasks/", response_model=List[Task])
-def list_tasks():
-    """Return all tasks (backed by Firestore 'todos' collection for continuity)."""
-    if db is None:
+
+@app.get("/tasks/")
+async def list_tasks():
+    """Return all tasks (backed by Firestore 'todos' collection for continuity).
+
+    Rows were validated on the write path, so they are returned as plain
+    dicts (with backfilled defaults) and serialized straight through
+    orjson — no per-row model validation on this read-only hot path.
+    """
+    if TODOS is None:
         raise HTTPException(status_code=503, detail="Datastore not available")
-    coll = db.collection("todos")
-    out: List[Task] = []
-    for doc in coll.stream():
-        data = doc.to_dict() or {}
-        # Backfill defaults expected by planner UI
-        data.setdefault("duration", 60)
-        data.setdefault("scheduledStart", None)
-        data.setdefault("recurrence", None)
-        data.pop("id", None)
-        out.append(Task(id=doc.id, **data))
+    global _list_cache
+    now = time.monotonic()
+    if _list_cache is not None and now - _list_cache[0] < _LIST_CACHE_TTL:
+        return _list_cache[1]
+    out: List[dict] = []
+    # .get() fetches the whole result set in one batched response instead of
+    # pulling documents incrementally over the gRPC stream.
+    for doc in await TODOS.get():
+        row = {**_TASK_DEFAULTS, **(doc.to_dict() or {})}
+        # Overwrites any stray stored 'id' with the document's real id.
+        row["id"] = doc.id
+        out.append(row)
+    _list_cache = (now, out)
     return out
 
 
 
 
 
-@app.put("/tasks/{task_id}", response_model=Task)
-def update_task(task_id: str, task: Task):
-    """Merge update an existing task in the 'todos' collection and return updated resource."""
-    if db is None:
+@app.put("/tasks/{task_id}")
+async def update_task(task_id: str, task: Task):
+    """Merge update an existing task in the 'todos' collection and return updated resource.
+
+    The response is the stored dict echoed directly (same shape as
+    list_tasks rows); rebuilding a Task here would re-run validators and
+    model_dump a second time on data the update just validated.
+    """
+    if TODOS is None:
         raise HTTPException(status_code=503, detail="Datastore not available")
-    coll = db.collection("todos")
-    ref = coll.document(task_id)
-    if not ref.get().exists:
+    ref = TODOS.document(task_id)
+    data = task.model_dump(exclude_unset=True, exclude={'id'})
+    if not data:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    # Single write that fails on a missing document instead of a separate
+    # existence-check read; halves Firestore round trips per update.
+    try:
+        await ref.update(data)
+    except NotFound:
         raise HTTPException(status_code=404, detail="Task not found")
-    data = task.model_dump(exclude_unset=True)
-    data.pop("id", None)
-    ref.set(data, merge=True)
-    updated = ref.get().to_dict() or {}
-    updated.setdefault("duration", 60)
-    updated.setdefault("scheduledStart", None)
-    updated.setdefault("recurrence", None)
-    updated.pop("id", None)
-    return Task(id=task_id, **updated)
+    _invalidate_list_cache()
+    # One read to pick up stored fields the partial update did not touch.
+    updated = (await ref.get()).to_dict() or {}
+    return {
+        "id": task_id,
+        "title": updated.get("title", ""),
+        "duration": updated.get("duration", 60),
+        "scheduledStart": updated.get("scheduledStart"),
+        "recurrence": updated.get("recurrence"),
+    }
 
 
 @app.delete("/tasks/{task_id}", status_code=204)
-def delete_task(task_id: str):
+async def delete_task(task_id: str):
     """Delete a task from the 'todos' collection."""
-    if db is None:
+    if TODOS is None:
         raise HTTPException(status_code=503, detail="Datastore not available")
-    coll = db.collection("todos")
-    ref = coll.document(task_id)
-    if not ref.get().exists:
+    ref = TODOS.document(task_id)
+    # Delete with an exists precondition so the server reports a missing
+    # document directly; avoids a read-before-write round trip.
+    try:
+        await ref.delete(option=db.write_option(exists=True))
+    except NotFound:
         raise HTTPException(status_code=404, detail="Task not found")
-    ref.delete()
+    _invalidate_list_cache()
     return
 
 
-@app.post("/tasks/", response_model=Task)
-def create_task(task: TaskCreate):
+@app.post("/tasks/")
+async def create_task(task: Task):
     """Create a new task in the 'todos' collection.
 
-    Accepts partial input (TaskCreate), applies server defaults, validates by
-    constructing a full `Task`, writes to Firestore, and returns the created
-    Task resource (including the assigned `id`).
+    FastAPI's body parse already runs the Task field validators (model
+    defaults cover omitted fields), so the parsed model is used as-is:
+    one validation pass and one model instance per create.
+    """
+    if TODOS is None:
+        raise HTTPException(status_code=503, detail="Datastore not available")
+    payload = task.model_dump(exclude={'id'})
+    doc_ref = TODOS.document()
+    await doc_ref.set(payload)
+    _invalidate_list_cache()
+
+    # The payload just written is already validated and in memory; echo it
+    # back with the assigned id instead of re-reading the document.
+    return {"id": doc_ref.id, **payload}
+
+
+# Firestore caps a single WriteBatch at 500 operations.
+_BATCH_LIMIT = 500
+
+
+@app.post("/tasks/bulk")
+async def create_tasks_bulk(tasks: List[Task]):
+    """Create many tasks in one request via Firestore write batches.
+
+    Entries are validated by the body parse (same single pass as
+    create_task). Writes are committed in chunks of up to 500 documents
+    (the Firestore batch limit), so N creates cost ceil(N/500) commits
+    instead of N round trips. Returns the created tasks with their ids.
     """
-    if db is None:
+    if TODOS is None:
         raise HTTPException(status_code=503, detail="Datastore not available")
-    coll = db.collection("todos")
-    # Normalize and fill defaults.
-    title = (task.title or '').strip() or 'Untitled'
-    duration = int(task.duration) if task.duration is not None else 60
-    scheduledStart = task.scheduledStart if task.scheduledStart else None
-    recurrence = task.recurrence if task.recurrence else None
-
-    # Validate by instantiating Task (will raise 422 if invalid)
-    validated = Task(
-        title=title,
-        duration=duration,
-        scheduledStart=scheduledStart,
-        recurrence=recurrence,
-    )
-
-    payload = validated.model_dump()
-    payload.pop('id', None)
-    doc_ref = coll.document()
-    doc_ref.set(payload)
-
-    # Return the canonical server resource
-    stored = coll.document(doc_ref.id).get().to_dict() or {}
-    stored.setdefault("duration", 60)
-    stored.setdefault("scheduledStart", None)
-    stored.setdefault("recurrence", None)
-    stored.pop('id', None)
-    return Task(id=doc_ref.id, **stored)
+    created: List[dict] = []
+    for start in range(0, len(tasks), _BATCH_LIMIT):
+        batch = db.batch()
+        for task in tasks[start:start + _BATCH_LIMIT]:
+            payload = task.model_dump(exclude={'id'})
+            doc_ref = TODOS.document()
+            batch.set(doc_ref, payload)
+            created.append({"id": doc_ref.id, **payload})
+        await batch.commit()
+    _invalidate_list_cache()
+    return created
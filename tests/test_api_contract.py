@@ -1,12 +1,18 @@
 from fastapi.testclient import TestClient
+from google.api_core.exceptions import NotFound
 import main
 
 
 class FakeSnapshot:
-    def __init__(self, data):
+    __slots__ = ('id', '_data')
+
+    def __init__(self, doc_id, data):
+        self.id = doc_id
         self._data = data
+
     def to_dict(self):
         return self._data
+
     @property
     def exists(self):
         return bool(self._data)
@@ -17,20 +23,28 @@ class FakeDocRef:
         self._col = collection
         self.id = doc_id
 
-    def set(self, payload, merge=False):
+    async def set(self, payload, merge=False):
         if merge and self.id in self._col.store:
             # merge
             self._col.store[self.id].update(payload)
         else:
             self._col.store[self.id] = dict(payload)
 
-    def get(self):
+    async def update(self, payload):
+        if self.id not in self._col.store:
+            raise NotFound(f'No document to update: {self.id}')
+        self._col.store[self.id].update(payload)
+
+    async def get(self):
         data = self._col.store.get(self.id)
-        return FakeSnapshot(data)
+        return FakeSnapshot(self.id, data)
 
-    def delete(self):
-        if self.id in self._col.store:
-            del self._col.store[self.id]
+    async def delete(self, option=None):
+        if self.id not in self._col.store:
+            if option and option.get('exists'):
+                raise NotFound(f'No document to delete: {self.id}')
+            return
+        del self._col.store[self.id]
 
 
 class FakeCollection:
@@ -41,13 +55,10 @@ class FakeCollection:
 
     def stream(self):
         for _id, data in list(self.store.items()):
-            snap = type('Doc', (), {})()
-            snap.id = _id
-            snap._data = data
-            def to_dict(self):
-                return self._data
-            snap.to_dict = to_dict.__get__(snap, snap.__class__)
-            yield snap
+            yield FakeSnapshot(_id, data)
+
+    async def get(self):
+        return list(self.stream())
 
     def document(self, doc_id=None):
         if not doc_id:
@@ -57,6 +68,19 @@ class FakeCollection:
         return FakeDocRef(self, doc_id)
 
 
+class FakeBatch:
+    def __init__(self):
+        self._ops = []
+
+    def set(self, doc_ref, payload):
+        self._ops.append((doc_ref, dict(payload)))
+
+    async def commit(self):
+        for doc_ref, payload in self._ops:
+            doc_ref._col.store[doc_ref.id] = payload
+        self._ops = []
+
+
 class FakeDB:
     def __init__(self):
         self._cols = {}
@@ -66,11 +90,19 @@ class FakeDB:
             self._cols[name] = FakeCollection(name)
         return self._cols[name]
 
+    def write_option(self, **kwargs):
+        return kwargs
+
+    def batch(self):
+        return FakeBatch()
+
 
 def test_crud_lifecycle(monkeypatch):
     # replace the real Firestore client with our fake
     fake_db = FakeDB()
     monkeypatch.setattr(main, 'db', fake_db)
+    monkeypatch.setattr(main, 'TODOS', fake_db.collection('todos'))
+    monkeypatch.setattr(main, '_list_cache', None)
     client = TestClient(main.app)
 
     # Create
@@ -100,3 +132,37 @@ def test_crud_lifecycle(monkeypatch):
     res5 = client.get('/tasks/')
     assert res5.status_code == 200
     assert not any(t['id'] == created_id for t in res5.json())
+
+
+def test_bulk_create(monkeypatch):
+    fake_db = FakeDB()
+    monkeypatch.setattr(main, 'db', fake_db)
+    monkeypatch.setattr(main, 'TODOS', fake_db.collection('todos'))
+    monkeypatch.setattr(main, '_list_cache', None)
+    client = TestClient(main.app)
+
+    res = client.post('/tasks/bulk', json=[
+        {'title': 'One', 'duration': 30},
+        {'title': 'Two', 'duration': 45},
+    ])
+    assert res.status_code == 200
+    created = res.json()
+    assert len(created) == 2
+    assert all(t['id'] for t in created)
+
+    listed = client.get('/tasks/').json()
+    assert {t['title'] for t in listed} == {'One', 'Two'}
+
+
+def test_update_and_delete_missing_task_return_404(monkeypatch):
+    fake_db = FakeDB()
+    monkeypatch.setattr(main, 'db', fake_db)
+    monkeypatch.setattr(main, 'TODOS', fake_db.collection('todos'))
+    monkeypatch.setattr(main, '_list_cache', None)
+    client = TestClient(main.app)
+
+    res = client.put('/tasks/nope', json={'title': 'Ghost', 'duration': 30})
+    assert res.status_code == 404
+
+    res2 = client.delete('/tasks/nope')
+    assert res2.status_code == 404
@@ -37,9 +37,18 @@ def test_scheduled_start_validation():
     t2 = Task(title='A', duration=30, scheduledStart='2025-11-07T10:00')
     # normalized to canonical UTC ISO (seconds + 'Z')
     assert t2.scheduledStart == '2025-11-07T10:00:00Z'
+    # canonical 'Z' inputs pass through; missing seconds are filled in
+    t3 = Task(title='A', duration=30, scheduledStart='2025-11-07T10:00:00Z')
+    assert t3.scheduledStart == '2025-11-07T10:00:00Z'
+    t4 = Task(title='A', duration=30, scheduledStart='2025-11-07T10:00Z')
+    assert t4.scheduledStart == '2025-11-07T10:00:00Z'
     # invalid string should raise
     with pytest.raises(ValidationError):
         Task(title='A', duration=30, scheduledStart='not-a-date')
+    # calendar-invalid values in canonical shape must still be rejected
+    for bad in ('2025-99-99T99:99:99Z', '2025-13-01T10:00Z', '2025-02-30T10:00:00Z'):
+        with pytest.raises(ValidationError):
+            Task(title='A', duration=30, scheduledStart=bad)
 
 
 def test_recurrence_validation_custom_days():